@@ -1,3 +1,6 @@
+from model.neural_network import NeuralNetwork
+
+
 class InputHandler:
     """
     Handles user input and passes it to the ModelController.
@@ -27,15 +30,17 @@ class InputHandler:
             if not (0 <= rating <= 1):
                 raise ValueError(f"Invalid rating {rating} for pattern {pattern_id}. Must be between 0 and 1.")
 
-        # Forward feedback to the controller
+        # Forward feedback to the controller, fetching the population only once
         print(f"Processing user feedback: {feedback}")
+        population = self.controller.get_population()
+        evaluate_subjective = self.controller.fitness_evaluator.evaluate_subjective
+        combine_scores = self.controller.fitness_evaluator.combine_scores
         for pattern_id, rating in feedback.items():
-            pattern = self._get_pattern_by_id(pattern_id)
-            if pattern:
-                subjective_score = self.controller.fitness_evaluator.evaluate_subjective(rating)
-                pattern.fitness = self.controller.fitness_evaluator.combine_scores(
-                    pattern.fitness, subjective_score
-                )
+            if not (0 <= pattern_id < len(population)):
+                print(f"Pattern ID {pattern_id} not found.")
+                continue
+            pattern = population[pattern_id]
+            pattern.fitness = combine_scores(pattern.fitness, evaluate_subjective(rating))
 
     def update_parameters(self, mutation_rate=None, crossover_rate=None, population_size=None):
         """
@@ -50,16 +55,31 @@ class InputHandler:
             None
         """
         # Validate parameters
-        if mutation_rate is not None and not (0 <= mutation_rate <= 1):
-            raise ValueError(f"Invalid mutation rate: {mutation_rate}. Must be between 0 and 1.")
-        if crossover_rate is not None and not (0 <= crossover_rate <= 1):
-            raise ValueError(f"Invalid crossover rate: {crossover_rate}. Must be between 0 and 1.")
+        for name, rate in (("mutation rate", mutation_rate), ("crossover rate", crossover_rate)):
+            if rate is not None and not (0 <= rate <= 1):
+                raise ValueError(f"Invalid {name}: {rate}. Must be between 0 and 1.")
         if population_size is not None and population_size <= 0:
             raise ValueError(f"Invalid population size: {population_size}. Must be greater than 0.")
 
         # Forward parameters to the controller
         self.controller.update_parameters(mutation_rate, crossover_rate, population_size)
 
+    def _start_command(self):
+        self.controller.start_simulation(self._neural_network_factory)
+
+    def _stop_command(self):
+        self.controller.stop_simulation()
+
+    def _reset_command(self):
+        self._stop_command()
+        self._start_command()
+
+    _COMMANDS = {
+        "start": _start_command,
+        "stop": _stop_command,
+        "reset": _reset_command,
+    }
+
     def handle_command(self, command):
         """
         Handles user commands such as 'start', 'stop', or 'reset'.
@@ -70,32 +90,10 @@ class InputHandler:
         Returns:
             None
         """
-        command = command.lower()
-        if command == "start":
-            self.controller.start_simulation(self._neural_network_factory)
-        elif command == "stop":
-            self.controller.stop_simulation()
-        elif command == "reset":
-            self.controller.stop_simulation()
-            self.controller.start_simulation(self._neural_network_factory)
-        else:
-            raise ValueError(f"Unknown command: {command}")
-
-    def _get_pattern_by_id(self, pattern_id):
-        """
-        Retrieves a pattern by its ID.
-
-        Args:
-            pattern_id (int): The ID of the pattern to retrieve.
-
-        Returns:
-            Pattern: The corresponding pattern, or None if not found.
-        """
-        population = self.controller.get_population()
-        if 0 <= pattern_id < len(population):
-            return population[pattern_id]
-        print(f"Pattern ID {pattern_id} not found.")
-        return None
+        handler = self._COMMANDS.get(command.lower())
+        if handler is None:
+            raise ValueError(f"Unknown command: {command.lower()}")
+        handler(self)
 
     def _neural_network_factory(self):
         """
@@ -104,5 +102,4 @@ class InputHandler:
         Returns:
             NeuralNetwork: A randomly initialized neural network.
         """
-        from model.neural_network import NeuralNetwork
         return NeuralNetwork(input_size=10, hidden_layers=[16, 16], output_size=100)
@@ -6,13 +6,46 @@ from control.output_handler import OutputHandler
 from model.neural_network import NeuralNetwork
 import neat
 import os
+import threading
 import numpy as np
+from functools import partial
+
+
+def _score_genome(genome, config, fitness_evaluator):
+    """
+    Scores a single genome in a worker process.
+
+    Args:
+        genome (neat.DefaultGenome): Genome to score
+        config (neat.Config): NEAT configuration
+        fitness_evaluator (FitnessEvaluator): Pickled copy of the evaluator
+
+    Returns:
+        float: Objective fitness of the genome's pattern
+    """
+    try:
+        pattern = Pattern(NeuralNetwork(genome, config))
+        if not isinstance(pattern.canvas, np.ndarray):
+            return 0.0
+        return fitness_evaluator.evaluate_objective(pattern)
+    except Exception as e:
+        print(f"Genome evaluation failed: {e}")
+        return 0.0
+
 
 class ModelController:
     """
     Manages NEAT-based simulation lifecycle and model-view communication.
     """
 
+    # Population size from which numpy reductions beat a plain Python loop
+    NUMPY_STATS_THRESHOLD = 256
+
+    # Population size from which scoring is spread over a process pool. Each
+    # task pickles its genome and the evaluator, which costs more than a
+    # small canvas takes to render and score, so small populations stay serial
+    PARALLEL_MIN_POPULATION = 200
+
     def __init__(self, root, config_path="config/neat-config.ini"):
         self.root = root
         self.config_path = config_path
@@ -35,67 +68,206 @@ class ModelController:
         self.is_running = False
         self.viewer = None
 
+        # Generations run on a worker thread; the lock serializes them
+        self._gen_thread = None
+        self._gen_lock = threading.RLock()
+        self._pending_stats = None  # (epoch, stats) awaiting the Tk thread
+        self._stats_lock = threading.Lock()  # Guards _pending_stats across threads
+        self._stats_epoch = 0  # Bumped by reset so older stats are dropped
+
+        # Rendered patterns keyed by genome id, invalidated each generation
+        self._pattern_cache = {}
+        self._stats_cache = (None, None)
+        self._nn_cache = {}
+        self._canvas_batch = None
+        self._snapshot_population()
+
+        # Process pool for large populations, alive only while running
+        self._parallel_evaluator = None
+
         # Initialize handlers
         self.input_handler = InputHandler(self)
         self.output_handler = OutputHandler()
 
     def start_simulation(self):
         """
-        Starts the NEAT evolutionary process.
+        Starts the NEAT evolutionary process on a background thread.
         """
         if not self.is_running:
             self.is_running = True
             print("NEAT simulation started.")
-            self._run_generations()
+            self._gen_thread = threading.Thread(target=self._gen_loop, daemon=True)
+            self._gen_thread.start()
 
-
-    def _run_generations(self):
-        """Core evolution loop with fitness generation sync"""
-        if self.is_running:
+    def _gen_loop(self):
+        """Core evolution loop; only UI updates are marshaled onto Tk"""
+        current_thread = threading.current_thread()
+        with self._gen_lock:
+            self._open_parallel_evaluator()
+        while self.is_running and self._gen_thread is current_thread:
             try:
-                # Run one generation of evolution
-                self.population.run(self.evaluate_genomes, 1)
-                self.current_generation += 1
-                
-                # Sync generation counter with fitness evaluator
-                self.fitness_evaluator.generation = self.current_generation
-                
-                # Update UI and schedule next generation
-                stats = self.get_generation_statistics()
-                if self.viewer:
-                    self.root.after(0, lambda: self.viewer.update_ui(stats))
-                    self.root.after(1000, self._run_generations)
-
+                with self._gen_lock:
+                    stats = self._run_generation()
+                    epoch = self._stats_epoch
             except neat.CompleteExtinctionException:
                 print("Population extinct! Restarting...")
                 self.reset_simulation()
                 self.start_simulation()
+                return
+
+            # Queued outside the lock: Tk calls from this thread wait on the
+            # Tk thread, which may itself be waiting on the lock in a reset
+            if self.viewer:
+                self._queue_stats(stats, epoch)
 
+        with self._gen_lock:
+            if self._gen_thread is current_thread:  # Not superseded by a restart
+                self._close_parallel_evaluator()
+
+    def _open_parallel_evaluator(self):
+        """
+        Starts the scoring process pool, when the population is large enough
+        to repay it and there is more than one core to spread it over.
+        """
+        cpu_count = os.cpu_count() or 1
+        if (self._parallel_evaluator is None and cpu_count > 1
+                and self.config.pop_size >= self.PARALLEL_MIN_POPULATION):
+            # The evaluator is sent with each task
+            self._parallel_evaluator = neat.ParallelEvaluator(
+                cpu_count,
+                partial(_score_genome, fitness_evaluator=self.fitness_evaluator)
+            )
+
+    def _close_parallel_evaluator(self):
+        """Shuts down the scoring process pool, if one is running"""
+        if self._parallel_evaluator is not None:
+            self._parallel_evaluator.pool.close()
+            self._parallel_evaluator.pool.join()
+            self._parallel_evaluator = None
+
+    def _run_generation(self):
+        """
+        Runs a single generation with fitness generation sync.
+
+        Returns:
+            dict: Statistics for the new generation
+        """
+        self.population.run(self._evaluate_generation, 1)
+        self.current_generation += 1
+        self._pattern_cache.clear()
+        self._stats_cache = (None, None)
+        self._snapshot_population()
+        self._prune_nn_cache()
+
+        # Sync generation counter with fitness evaluator
+        self.fitness_evaluator.generation = self.current_generation
+        return self.get_generation_statistics()
+
+    def _queue_stats(self, stats, epoch):
+        """
+        Hands the latest statistics to Tk. Generations run unthrottled, so at
+        most one refresh is kept pending and it always shows the newest stats.
+
+        Args:
+            stats (dict): Statistics of the finished generation
+            epoch (int): Reset epoch the generation ran in
+        """
+        with self._stats_lock:
+            refresh_pending = self._pending_stats is not None
+            self._pending_stats = (epoch, stats)
+        if not refresh_pending:
+            self.root.after_idle(self._push_stats)
+
+    def _push_stats(self):
+        """Pushes the latest generation statistics to the viewer (Tk thread only)"""
+        with self._stats_lock:
+            pending, self._pending_stats = self._pending_stats, None
+            current_epoch = self._stats_epoch
+        if pending is None:
+            return
+        epoch, stats = pending
+        # Stats of a generation that finished around a reset are stale
+        if self.viewer and epoch == current_epoch:
+            self.viewer.update_ui(stats)
+
+    def _evaluate_generation(self, genomes, config):
+        """
+        Scores a generation, in parallel for populations large enough to
+        repay the process pool. Novelty scoring mutates the shared archive,
+        so that phase is always serial.
+        """
+        if (self._parallel_evaluator is None or self.fitness_evaluator.uses_archive
+                or len(genomes) < self.PARALLEL_MIN_POPULATION):
+            self.evaluate_genomes(genomes, config)
+        else:
+            self._parallel_evaluator.evaluate(genomes, config)
 
     def evaluate_genomes(self, genomes, config):
         """
         NEAT-compatible fitness evaluation function.
         """
+        nn_for = self._nn_for
+        canvas_batch = self._get_canvas_batch(len(genomes))
+
+        scored = []
         for genome_id, genome in genomes:
             try:
-                # Create neural network from genome
-                neural_net = NeuralNetwork(genome, self.config)
-                
-                # Create pattern and generate artwork
-                pattern = Pattern(neural_net)
-                pattern.generate_pattern()
-                
-                # Ensure canvas is valid before evaluation
-                if pattern.canvas is None or not isinstance(pattern.canvas, np.ndarray):
-                    genome.fitness = 0.0
-                    continue
-                    
-                # Evaluate fitness using phased evaluator
-                genome.fitness = self.fitness_evaluator.evaluate_objective(pattern)
-                
+                # Render straight into the next slot of the shared batch
+                pattern = Pattern(nn_for(genome))
+                pattern.generate_pattern(out=canvas_batch[len(scored)])
             except Exception as e:
                 print(f"Genome evaluation failed: {e}")
                 genome.fitness = 0.0  # Assign minimum fitness
+                continue
+            scored.append((genome, pattern))
+
+        # Score the whole generation in one batched call, straight from the
+        # batch unless a failed render left a canvas outside it
+        patterns = [pattern for _, pattern in scored]
+        stack = canvas_batch[:len(patterns)]
+        if not all(pattern.canvas.base is canvas_batch for pattern in patterns):
+            stack = None
+        fitness_values = self.fitness_evaluator.evaluate_population(patterns, stack)
+        for (genome, _), fitness in zip(scored, fitness_values):
+            genome.fitness = fitness
+
+    def _get_canvas_batch(self, size):
+        """
+        Returns a contiguous (size, side, side) buffer holding one canvas per
+        genome, reallocated only when the population outgrows it.
+        """
+        if self._canvas_batch is None or len(self._canvas_batch) < size:
+            side = int(np.sqrt(self.config.genome_config.num_outputs))
+            self._canvas_batch = np.empty((size, side, side), dtype=np.uint8)
+        return self._canvas_batch
+
+    def _nn_for(self, genome):
+        """
+        Returns the NeuralNetwork wrapper for a genome, building it only once
+        for genomes that survive across generations.
+        """
+        try:
+            neural_net = self._nn_cache[genome.key]
+            if neural_net.genome is genome:
+                return neural_net
+        except KeyError:
+            pass
+        neural_net = self._nn_cache[genome.key] = NeuralNetwork(genome, self.config)
+        return neural_net
+
+    def _snapshot_population(self):
+        """
+        Freezes the current genome order so feedback, stats and the UI all
+        index the same view until the next generation.
+        """
+        # One attribute, so readers on the Tk thread never pair the keys of
+        # one generation with the genomes of another
+        self._members = tuple(self.population.population.items())
+
+    def _prune_nn_cache(self):
+        """Drops cached networks for genomes no longer in the population"""
+        for genome_id in self._nn_cache.keys() - {key for key, _ in self._members}:
+            del self._nn_cache[genome_id]
 
     def stop_simulation(self):
         """
@@ -104,53 +276,110 @@ class ModelController:
         self.is_running = False
         print("Simulation stopped.")
 
+    def shutdown(self):
+        """
+        Stops the simulation and its worker processes; call on exit.
+        """
+        self.stop_simulation()
+        with self._gen_lock:  # Wait for an in-flight generation to finish
+            self._close_parallel_evaluator()
+
 
     def reset_simulation(self):
         """Full system reset with fitness history clear"""
         self.stop_simulation()
-        self.output_handler.reset()
-        self.population = neat.Population(self.config)
-        self.current_generation = 0
-        self.fitness_evaluator.generation = 0  # Reset phased evaluation
-        self.fitness_evaluator.archive = []    # Clear novelty archive
+        with self._gen_lock:  # Wait for an in-flight generation to finish
+            self.output_handler.reset()
+            self.population = neat.Population(self.config)
+            self.current_generation = 0
+            self._pattern_cache.clear()
+            self._stats_cache = (None, None)
+            self._nn_cache.clear()
+            self._snapshot_population()
+            with self._stats_lock:
+                self._pending_stats = None
+                self._stats_epoch += 1
+            self.fitness_evaluator.generation = 0  # Reset phased evaluation
+            self.fitness_evaluator.clear_archive()
         print("Simulation fully reset")
         
     def get_population(self):
         """
         Retrieves current population as Pattern objects.
+
+        Patterns are cached per genome and only rebuilt when the genome's
+        fitness changes or a new generation has been run. Canvases are not
+        rendered here; they are generated lazily on first access.
         """
         population = []
-        for genome in self.population.population.values():
-            neural_net = NeuralNetwork(genome, self.config)  # Use wrapper
+        for genome_id, genome in self._members:
+            try:
+                pattern, cached_fitness = self._pattern_cache[genome_id]
+                if cached_fitness == genome.fitness:
+                    population.append(pattern)
+                    continue
+            except KeyError:
+                pass
+
+            neural_net = self._nn_for(genome)  # Use wrapper
             pattern = Pattern(neural_net)  # Correct initialization
             pattern.fitness = genome.fitness if genome.fitness else 0.0
-            if pattern.canvas is None:
-                pattern.generate_pattern()
+            self._pattern_cache[genome_id] = (pattern, genome.fitness)
             population.append(pattern)
         return population
 
     def get_generation_statistics(self):
         """
         Provides statistics about the current generation.
+
+        Reads fitness straight from the genomes and caches the result until
+        the next generation (or user feedback) changes it.
         """
-        population = self.get_population()
-        fitness_values = [p.fitness if p.fitness is not None else 0.0 for p in population]
-        return {
+        cached_generation, cached_stats = self._stats_cache
+        if cached_generation == self.current_generation:
+            return cached_stats
+
+        genomes = [genome for _, genome in self._members]
+        count = len(genomes)
+        if count >= self.NUMPY_STATS_THRESHOLD:
+            fitness_values = np.fromiter(
+                (g.fitness or 0.0 for g in genomes), dtype=np.float32, count=count
+            )
+            average_fitness = float(fitness_values.mean())
+            best_fitness = float(fitness_values.max())
+        else:
+            # Single streaming pass; cheaper than numpy setup for small populations
+            total = 0.0
+            best_fitness = float("-inf")
+            for genome in genomes:
+                fitness = genome.fitness or 0.0
+                total += fitness
+                if fitness > best_fitness:
+                    best_fitness = fitness
+            average_fitness = total / count if count else 0.0
+            best_fitness = best_fitness if count else 0.0
+
+        stats = {
             "generation": self.current_generation,
-            "average_fitness": sum(fitness_values)/len(fitness_values),
-            "best_fitness": max(fitness_values) if fitness_values else 0,
-            "population_size": len(population)
+            "average_fitness": average_fitness,
+            "best_fitness": best_fitness,
+            "population_size": count
         }
+        self._stats_cache = (self.current_generation, stats)
+        return stats
 
     def process_user_feedback(self, feedback):
         """
         Processes user ratings for interactive evolution.
         """
-        population = self.population.population
+        if not all(0 <= rating <= 1 for rating in feedback.values()):
+            raise ValueError("Invalid rating in feedback. Ratings must be between 0 and 1.")
+
+        members = self._members
         for idx, rating in feedback.items():
-            if 0 <= idx < len(population):
-                genome_id = list(population.keys())[idx]
-                population[genome_id].fitness = rating
+            if 0 <= idx < len(members):
+                members[idx][1].fitness = rating
+        self._stats_cache = (None, None)
         print("Updated fitness based on user feedback")
 
     def export_evolution_data(self, format="video"):
@@ -163,7 +392,8 @@ class ModelController:
         """
         Provides NEAT simulation status.
         """
+        stats = self.get_generation_statistics()
         return (f"ModelController(NEAT)\n"
                 f"Generations: {self.current_generation}\n"
-                f"Population: {len(self.get_population())} patterns\n"
-                f"Best Fitness: {self.get_generation_statistics()['best_fitness']:.2f}")
\ No newline at end of file
+                f"Population: {stats['population_size']} patterns\n"
+                f"Best Fitness: {stats['best_fitness']:.2f}")
\ No newline at end of file
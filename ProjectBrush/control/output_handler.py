@@ -1,7 +1,17 @@
 import os
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
 import matplotlib.pyplot as plt
+import matplotlib.cm as cm
 from matplotlib.animation import FuncAnimation
 import numpy as np
+from PIL import Image
+
+try:
+    import pyspng
+except ImportError:
+    pyspng = None
 
 
 class OutputHandler:
@@ -9,6 +19,15 @@ class OutputHandler:
     Handles exporting and logging data for the evolution process.
     """
 
+    # Viridis colors for each uint8 canvas value, shape (256, 3)
+    VIRIDIS_LUT = cm.viridis(np.arange(256), bytes=True)[:, :3]
+
+    # Target edge length in pixels of exported videos
+    VIDEO_SIZE = 480
+
+    # Generations between flushes of the buffered statistics log
+    LOG_FLUSH_INTERVAL = 10
+
     def __init__(self, export_dir="exports"):
         """
         Initializes the OutputHandler.
@@ -17,6 +36,7 @@ class OutputHandler:
             export_dir (str): Directory to save exported files.
         """
         self.export_dir = export_dir
+        self._log_file = None
         self._ensure_directory(self.export_dir)
 
     def reset(self):
@@ -26,15 +46,8 @@ class OutputHandler:
         Returns:
             None
         """
-        if os.path.exists(self.export_dir):
-            for file in os.listdir(self.export_dir):
-                file_path = os.path.join(self.export_dir, file)
-                if os.path.isfile(file_path):
-                    os.remove(file_path)
-                elif os.path.isdir(file_path):
-                    for sub_file in os.listdir(file_path):
-                        os.remove(os.path.join(file_path, sub_file))
-                    os.rmdir(file_path)
+        self.close()
+        shutil.rmtree(self.export_dir, ignore_errors=True)
         self._ensure_directory(self.export_dir)
         print("OutputHandler reset.")
 
@@ -70,49 +83,115 @@ class OutputHandler:
         generation_dir = os.path.join(self.export_dir, f"generation_{generation}")
         self._ensure_directory(generation_dir)
 
-        for i, pattern in enumerate(population):
-            if pattern.canvas is not None:
-                image_path = os.path.join(generation_dir, f"pattern_{i}.png")
-                self._save_image(pattern.canvas, image_path)
+        items = [
+            (pattern.canvas, os.path.join(generation_dir, f"pattern_{i}.png"))
+            for i, pattern in enumerate(population)
+            if pattern.canvas is not None
+        ]
+
+        # PNG encoding releases the GIL, so encode and write in parallel
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            list(executor.map(self._save_image_tuple, items))
 
         print(f"Exported generation {generation} as images to {generation_dir}.")
 
     def export_video(self, evolution, fps=5):
         """
         Exports the evolution process as a video.
+
+        Frames are colorized through the viridis LUT and piped to ffmpeg as
+        raw RGB; if ffmpeg is unavailable a GIF is written instead.
+
+        Args:
+            evolution (Evolution): The evolution object.
+            fps (int): Frames per second.
+
+        Returns:
+            None
         """
+        population = evolution.get_population()
+        if not population:
+            print("No population to export.")
+            return
+
+        best_pattern = max(population, key=lambda p: p.fitness)
         video_path = os.path.join(self.export_dir, "evolution_video.mp4")
-        fig, ax = plt.subplots()
-    
-        def update(frame):
-            ax.clear()
-            population = evolution.get_population()
-            if population:
-                best_pattern = max(population, key=lambda p: p.fitness)
-                if best_pattern.canvas is not None:
-                    ax.imshow(best_pattern.canvas, cmap="viridis")
-                    ax.set_title(f"Generation: {frame}, Fitness: {best_pattern.fitness:.2f}")
-                else:
-                    ax.text(0.5, 0.5, "No valid canvas", ha="center", va="center")
-            else:
-                ax.text(0.5, 0.5, "No population", ha="center", va="center")
-    
-        ani = FuncAnimation(fig, update, frames=evolution.generation_count, repeat=False)
-    
         try:
-            # Try exporting as MP4 with FFmpeg
-            ani.save(video_path, fps=fps, writer="ffmpeg")
+            self._stream_video(best_pattern.canvas, evolution.generation_count, video_path, fps)
             print(f"Exported evolution video to {video_path}.")
-        except Exception as e:
+        except (OSError, subprocess.CalledProcessError) as e:
             print(f"FFmpeg unavailable: {e}")
             print("Falling back to GIF export.")
             gif_path = os.path.join(self.export_dir, "evolution_video.gif")
-            ani.save(gif_path, fps=fps, writer="pillow")
+            self._export_gif(best_pattern, evolution.generation_count, gif_path, fps)
             print(f"Exported evolution video as GIF to {gif_path}.")
-    
-            ani = FuncAnimation(fig, update, frames=evolution.generation_count, repeat=False)
-            ani.save(video_path, fps=fps, writer="ffmpeg")
-            print(f"Exported evolution video to {video_path}.")
+
+    def _stream_video(self, canvas, frame_count, video_path, fps):
+        """
+        Writes frames straight to an ffmpeg process over a pipe.
+
+        Args:
+            canvas (numpy array): The uint8 canvas to show in each frame.
+            frame_count (int): Number of frames to write.
+            video_path (str): Path of the MP4 file to write.
+            fps (int): Frames per second.
+
+        Returns:
+            None
+        """
+        frame = np.ascontiguousarray(self.VIRIDIS_LUT[canvas])
+
+        # Upscale with nearest-neighbour to a viewable, even-sized video
+        height, width = frame.shape[:2]
+        factor = max(1, self.VIDEO_SIZE // max(height, width))
+        out_width, out_height = (width * factor + 1) // 2 * 2, (height * factor + 1) // 2 * 2
+
+        command = [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}",
+            "-r", str(fps), "-i", "-",
+            "-vf", f"scale={out_width}:{out_height}:flags=neighbor",
+            "-c:v", "libx264", "-preset", "ultrafast", "-tune", "zerolatency",
+            "-threads", "2", "-pix_fmt", "yuv420p", video_path,
+        ]
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, bufsize=1 << 20)
+        try:
+            frame_bytes = frame.tobytes()
+            for _ in range(max(frame_count, 1)):
+                process.stdin.write(frame_bytes)
+        finally:
+            process.stdin.close()
+            returncode = process.wait()
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, command)
+
+    def _export_gif(self, best_pattern, frame_count, gif_path, fps):
+        """
+        Renders the evolution process to a GIF with matplotlib.
+
+        The figure and image artist are created once; each frame only swaps
+        the image data and title.
+
+        Args:
+            best_pattern (Pattern): The pattern to show in each frame.
+            frame_count (int): Number of frames to render.
+            gif_path (str): Path of the GIF file to write.
+            fps (int): Frames per second.
+
+        Returns:
+            None
+        """
+        fig, ax = plt.subplots()
+        image = ax.imshow(np.zeros_like(best_pattern.canvas), cmap="viridis", vmin=0, vmax=255)
+
+        def update(frame):
+            image.set_data(best_pattern.canvas)
+            ax.set_title(f"Generation: {frame}, Fitness: {best_pattern.fitness:.2f}")
+            return (image,)
+
+        ani = FuncAnimation(fig, update, frames=frame_count, repeat=False)
+        ani.save(gif_path, fps=fps, writer="pillow")
+        plt.close(fig)
 
     def log_statistics(self, stats, generation):
         """
@@ -125,13 +204,41 @@ class OutputHandler:
         Returns:
             None
         """
-        log_file = os.path.join(self.export_dir, "evolution_log.txt")
-        with open(log_file, "a") as f:
-            log_entry = f"Generation {generation}: {stats}\n"
-            f.write(log_entry)
+        if self._log_file is None:
+            log_path = os.path.join(self.export_dir, "evolution_log.txt")
+            self._log_file = open(log_path, "a", buffering=1 << 16)
+        self._log_file.write(f"Generation {generation}: {stats}\n")
+        if generation % self.LOG_FLUSH_INTERVAL == 0:
+            self._log_file.flush()
 
         print(f"Logged statistics for generation {generation}.")
 
+    def close(self):
+        """
+        Flushes and closes the statistics log.
+
+        Returns:
+            None
+        """
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+
+    def __del__(self):
+        self.close()
+
+    def _save_image_tuple(self, item):
+        """
+        Saves a (canvas, path) pair; adapter for executor.map.
+
+        Args:
+            item (tuple): The canvas and the path to save it to.
+
+        Returns:
+            None
+        """
+        self._save_image(*item)
+
     def _save_image(self, canvas, path):
         """
         Saves a single pattern canvas as an image.
@@ -144,7 +251,12 @@ class OutputHandler:
             None
         """
         if canvas is not None:
-            plt.imsave(path, canvas, cmap="viridis")
+            rgb = self.VIRIDIS_LUT[canvas]
+            if pyspng is not None:
+                with open(path, "wb") as f:
+                    f.write(pyspng.encode(rgb, compress_level=1))
+            else:
+                Image.fromarray(rgb).save(path, compress_level=1)
         else:
             print(f"Skipped saving image to {path}: canvas is None.")
 
@@ -28,6 +28,7 @@ def main():
     
     # Start the application
     root.mainloop()
+    controller.shutdown()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
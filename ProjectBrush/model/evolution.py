@@ -1,4 +1,5 @@
-import random
+import copy
+import numpy as np
 from model.pattern import Pattern
 from model.fitness_evaluator import FitnessEvaluator
 
@@ -7,7 +8,10 @@ class Evolution:
     Manages the evolutionary process for generating and evolving patterns.
     """
 
-    def __init__(self, population_size, mutation_rate, crossover_rate, fitness_evaluator):
+    # Standard deviation of the Gaussian noise added to mutated weights
+    MUTATION_SCALE = 0.1
+
+    def __init__(self, population_size, mutation_rate, crossover_rate, fitness_evaluator, seed=None):
         """
         Initializes the Evolution manager.
 
@@ -16,6 +20,7 @@ class Evolution:
             mutation_rate (float): Probability of mutation.
             crossover_rate (float): Probability of crossover.
             fitness_evaluator (FitnessEvaluator): The fitness evaluation object.
+            seed (int, optional): Seed for the random number generator.
         """
         self.population_size = population_size
         self.mutation_rate = mutation_rate
@@ -23,6 +28,9 @@ class Evolution:
         self.fitness_evaluator = fitness_evaluator
         self.population = []
         self.generation_count = 0
+        self._rng = np.random.default_rng(seed)
+        self._cum_fitness = None  # Cumulative fitness for selection, rebuilt per generation
+        self._scored_phase = None  # Evaluation phase the cached fitness values belong to
 
     def initialize_population(self, neural_network_factory):
         """
@@ -33,13 +41,26 @@ class Evolution:
         ]
         for pattern in self.population:
             pattern.generate_pattern()
+        self._cum_fitness = None
 
     def evaluate_population(self):
         """
-        Evaluates the fitness of the entire population.
-        """
-        for pattern in self.population:
-            pattern.evaluate_fitness(self.fitness_evaluator)
+        Evaluates the fitness of the entire population in one batched call,
+        skipping patterns whose canvas has not changed. Cached fitness is
+        only reused within one phase, and never once novelty scoring reads
+        the archive, which changes as patterns are scored.
+        """
+        evaluator = self.fitness_evaluator
+        if evaluator.phase != self._scored_phase or evaluator.uses_archive:
+            pending = self.population
+        else:
+            pending = [p for p in self.population if p.needs_evaluation]
+        self._scored_phase = evaluator.phase
+        fitness_values = evaluator.evaluate_population(pending)
+        for pattern, fitness in zip(pending, fitness_values):
+            pattern.fitness = fitness
+            pattern.needs_evaluation = False
+        self._cum_fitness = None
 
     def select_parents(self):
         """
@@ -48,15 +69,18 @@ class Evolution:
         Returns:
             tuple: Two parent patterns.
         """
-        total_fitness = sum(p.fitness for p in self.population)
+        if self._cum_fitness is None:
+            self._cum_fitness = np.cumsum([p.fitness for p in self.population], dtype=float)
+
+        total_fitness = self._cum_fitness[-1]
         if total_fitness == 0:
             # If all fitness scores are zero, select randomly
-            return random.sample(self.population, 2)
-        
-        probabilities = [p.fitness / total_fitness for p in self.population]
-        parent1 = random.choices(self.population, weights=probabilities, k=1)[0]
-        parent2 = random.choices(self.population, weights=probabilities, k=1)[0]
-        return parent1, parent2
+            idx = self._rng.choice(len(self.population), 2, replace=False)
+            return self.population[idx[0]], self.population[idx[1]]
+
+        # Binary search both spins of the wheel at once
+        idx = np.searchsorted(self._cum_fitness, self._rng.random(2) * total_fitness, side="right")
+        return self.population[idx[0]], self.population[idx[1]]
 
     def crossover(self, parent1, parent2):
         """
@@ -69,19 +93,14 @@ class Evolution:
         Returns:
             Pattern: The offspring pattern.
         """
-        offspring_network = parent1.neural_network  # Start with a copy of parent1's network
-        if random.random() < self.crossover_rate:
-            for i in range(len(offspring_network.weights)):
-                # Blend weights from both parents
-                offspring_network.weights[i] = (parent1.neural_network.weights[i] + parent2.neural_network.weights[i]) / 2
-            for i in range(len(offspring_network.biases)):
-                # Blend biases from both parents
-                offspring_network.biases[i] = (parent1.neural_network.biases[i] + parent2.neural_network.biases[i]) / 2
-        return Pattern(offspring_network)
-        
-        offspring = Pattern(offspring_network)
-        offspring.generate_pattern()  # Add this line
-        return offspring
+        network1, network2 = parent1.neural_network, parent2.neural_network
+
+        # Blend each weight with probability crossover_rate, one mask per layer;
+        # np.where returns fresh arrays, so a shallow copy leaves parent1 intact
+        offspring_network = copy.copy(network1)
+        offspring_network.weights = [self._blend(w1, w2) for w1, w2 in zip(network1.weights, network2.weights)]
+        offspring_network.biases = [self._blend(b1, b2) for b1, b2 in zip(network1.biases, network2.biases)]
+        return Pattern(offspring_network)  # Canvas renders lazily on first access
 
     def mutate(self, pattern):
         """
@@ -93,8 +112,40 @@ class Evolution:
         Returns:
             None
         """
-        pattern.mutate(self.mutation_rate)
-        pattern.generate_pattern() 
+        network = pattern.neural_network
+        network.weights = [self._perturb(w) for w in network.weights]
+        network.biases = [self._perturb(b) for b in network.biases]
+        pattern.generate_pattern()
+
+    def _blend(self, a, b):
+        """
+        Averages two parameter arrays where a crossover mask is set.
+
+        Args:
+            a (numpy array): Parameters of the first parent.
+            b (numpy array): Parameters of the second parent.
+
+        Returns:
+            numpy array: The blended parameters.
+        """
+        mask = self._rng.random(np.shape(a)) < self.crossover_rate
+        return np.where(mask, 0.5 * (a + b), a)
+
+    def _perturb(self, params):
+        """
+        Adds Gaussian noise to parameters where a mutation mask is set.
+
+        Args:
+            params (numpy array): The parameters to mutate.
+
+        Returns:
+            numpy array: The mutated parameters.
+        """
+        mutated = np.array(params)  # Copy; parents may share this array
+        mask = self._rng.random(mutated.shape) < self.mutation_rate
+        # Draw noise only for the entries being mutated
+        mutated[mask] += self._rng.normal(0.0, self.MUTATION_SCALE, np.count_nonzero(mask))
+        return mutated
 
     def generate_next_generation(self):
         """
@@ -105,9 +156,13 @@ class Evolution:
         """
         new_population = []
 
-        # Elitism: Keep the top-performing pattern
-        self.population.sort(key=lambda p: p.fitness, reverse=True)
-        new_population.append(self.population[0])  # Add the best pattern
+        # Read every fitness once; it feeds both elitism and the selection wheel
+        fitnesses = np.fromiter((p.fitness for p in self.population), dtype=float, count=len(self.population))
+
+        # Elitism: Keep the top-performing pattern (linear scan, no sort)
+        new_population.append(self.population[int(np.argmax(fitnesses))])
+
+        self._cum_fitness = np.cumsum(fitnesses)
 
         # Generate the rest of the new population
         while len(new_population) < self.population_size:
@@ -117,6 +172,7 @@ class Evolution:
             new_population.append(offspring)
 
         self.population = new_population
+        self._cum_fitness = None
         self.generation_count += 1
 
     def get_population(self):
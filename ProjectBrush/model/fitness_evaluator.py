@@ -1,12 +1,69 @@
+import functools
+import math
 import numpy as np
 from model.fitness_utils import FitnessUtils
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+    @njit(fastmath=True, cache=True)
+    def _phase1_kernel(canvas):
+        """
+        Fused phase 1 metrics for a uint8 canvas in a single pass.
+
+        Returns:
+            tuple: (symmetry, normalized std, active area fraction)
+        """
+        h, w = canvas.shape
+        half = w // 2
+        diff = 0.0
+        total = 0.0
+        squares = 0.0
+        active = 0
+        for y in range(h):
+            for x in range(w):
+                value = float(canvas[y, x])
+                total += value
+                squares += value * value
+                if value > 25:
+                    active += 1
+                if x < half:
+                    diff += abs(value - float(canvas[y, w - 1 - x]))
+        n = h * w
+        mean = total / n
+        std = math.sqrt(max(squares / n - mean * mean, 0.0))
+        symmetry = 1.0 - diff / (h * half) / 255 if half > 0 else 0.0
+        return symmetry, std / 255, active / n
+else:
+    _phase1_kernel = None
+
+
 class FitnessEvaluator:
+    # Last generation of each evaluation phase
+    PHASE1_END = 50
+    PHASE2_END = 150
+
+    # Most novel feature vectors kept; oldest are evicted first
+    ARCHIVE_SIZE = 256
+
+    # Length of the block-mean feature vector used for novelty
+    HASH_SIZE = 32
+
     def __init__(self, user_weight=0.3):
         self.generation = 0
         self.archive = []
+        self._archive_matrix = None  # np.stack(self.archive), rebuilt on change
         self.user_weight = max(0.0, min(1.0, user_weight))
 
+    def clear_archive(self):
+        """Empties the novelty archive"""
+        self.archive = []
+        self._archive_matrix = None
+
     def evaluate(self, pattern, user_feedback=None):
         objective = self.evaluate_objective(pattern)
         if user_feedback is not None:
@@ -18,17 +75,107 @@ class FitnessEvaluator:
         if not isinstance(pattern.canvas, np.ndarray):
             return 0.0
             
-        if self.generation <= 50:
+        if self.generation <= self.PHASE1_END:
             return self._phase1_symmetry_contrast(pattern)
-        elif 51 <= self.generation <= 150:
+        elif self.generation <= self.PHASE2_END:
             return self._phase2_composition(pattern)
         else:
             return self._phase3_novelty(pattern)
+
+    def evaluate_population(self, patterns, stack=None):
+        """
+        Batched phased evaluation of several patterns at once.
+
+        Canvases are stacked into one (N, H, W) array so symmetry, contrast,
+        active area and edge density each run as a single vectorized pass.
+        Falls back to per-pattern scoring if canvases are missing or differ
+        in shape.
+
+        Args:
+            patterns (list of Pattern): Patterns to score
+            stack (numpy.ndarray, optional): (N, H, W) array already holding
+                the patterns' canvases in order, used instead of restacking
+
+        Returns:
+            list of float: Fitness of each pattern, in order.
+        """
+        canvases = [p.canvas for p in patterns]
+        if stack is None:
+            if not canvases or not all(
+                isinstance(c, np.ndarray) and c.ndim == 2 and c.shape == canvases[0].shape
+                for c in canvases
+            ):
+                return [self.evaluate_objective(p) for p in patterns]
+            stack = np.stack(canvases)
+        scores = self._phase1_batch(stack)
+        if self.generation > self.PHASE1_END:
+            edge_density = FitnessUtils.detect_edge_density(stack)
+            color_coherence = np.array([FitnessUtils.calculate_color_coherence(c) for c in canvases])
+            scores = 0.6*scores + 0.25*edge_density + 0.15*color_coherence
+        if self.generation > self.PHASE2_END:
+            # Archive updates are order-dependent, so novelty stays sequential
+            novelty = np.array([self._compare_to_archive(c) for c in canvases])
+            scores = 0.7*scores + 0.3*novelty
+        return scores.tolist()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4)
+    def _make_evaluators(shape):
+        """
+        Builds symmetry, active area and novelty feature closures for one
+        canvas shape, with slice bounds and block sizes precomputed.
+
+        Returns:
+            tuple: (symmetry, active_area, block_features) callables
+        """
+        w = shape[-1]
+        half = w // 2
+        mirror = slice(w - 1, half - 1 + w%2, -1)  # Right half, flipped
+        pixels = math.prod(shape)
+        bounds = np.linspace(0, pixels, FitnessEvaluator.HASH_SIZE + 1).astype(int)
+        starts, sizes = bounds[:-1], np.diff(bounds)
+
+        def symmetry(canvas):
+            left = canvas[..., :half].astype(np.int16)
+            return 1 - np.mean(np.abs(left - canvas[..., mirror])) / 255
+
+        def active_area(canvas):
+            return np.count_nonzero(canvas > 25) / pixels  # Above 10% intensity
+
+        def block_features(canvas):
+            return np.add.reduceat(canvas.ravel().astype(np.float64), starts) / sizes
+
+        return symmetry, active_area, block_features
+
+    @property
+    def phase(self):
+        """Evaluation phase (1-3) the current generation is scored in"""
+        return 1 + (self.generation > self.PHASE1_END) + (self.generation > self.PHASE2_END)
+
+    @property
+    def uses_archive(self):
+        """Whether scoring reads and updates the shared novelty archive"""
+        return self.generation > self.PHASE2_END
     
     def _phase1_symmetry_contrast(self, pattern):
+        if _phase1_kernel is not None and pattern.canvas.ndim == 2:
+            symmetry, contrast, active_area = _phase1_kernel(pattern.canvas)
+            return 0.4*symmetry + 0.4*max(contrast, 0.1) + 0.2*active_area
+
         symmetry = self._evaluate_symmetry(pattern.canvas)
         contrast = self._evaluate_contrast(pattern.canvas)
-        active_area = np.mean(pattern.canvas > 0.1)  # Use element-wise comparison
+        active_area = self._make_evaluators(pattern.canvas.shape)[1](pattern.canvas)
+        return 0.4*symmetry + 0.4*contrast + 0.2*active_area
+
+    def _phase1_batch(self, stack):
+        """Phase 1 score for a (N, H, W) stack of canvases"""
+        w = stack.shape[2]
+        half = w // 2
+        left = stack[:, :, :half].astype(np.int16)
+        right = stack[:, :, half + w%2:][:, :, ::-1]
+        symmetry = 1 - np.mean(np.abs(left - right), axis=(1, 2)) / 255
+        contrast = np.maximum(stack.reshape(len(stack), -1).std(axis=1) / 255, 0.1)
+        active_area = np.mean(stack > 25, axis=(1, 2))
         return 0.4*symmetry + 0.4*contrast + 0.2*active_area
 
     def _phase2_composition(self, pattern):
@@ -44,33 +191,37 @@ class FitnessEvaluator:
 
     def _compare_to_archive(self, canvas):
         """Novelty detection with archive management"""
-        hash_size = 32
-        flat = (canvas * 255).astype(np.uint8).flatten()
-        features = np.mean(flat.reshape(-1, hash_size), axis=1)
+        # Mean of HASH_SIZE near-equal contiguous blocks
+        features = self._make_evaluators(canvas.shape)[2](canvas)
         
         if not self.archive:
-            self.archive.append(features)
+            self._add_to_archive(features)
             return 1.0  # First pattern is maximally novel
-            
-        distances = [np.linalg.norm(features - a) for a in self.archive]
-        novelty = np.mean(distances) / (255 * np.sqrt(hash_size))
+
+        # All distances to the archive in one broadcast
+        diffs = self._archive_matrix - features
+        distances = np.sqrt(np.einsum("ij,ij->i", diffs, diffs))
+        novelty = np.mean(distances) / (255 * np.sqrt(self.HASH_SIZE))
         
         if novelty > 0.7:
-            self.archive.append(features)
+            self._add_to_archive(features)
             
         return min(novelty, 1.0)
 
+    def _add_to_archive(self, features):
+        """Appends to the archive with FIFO eviction and restacks the matrix"""
+        self.archive.append(features)
+        if len(self.archive) > self.ARCHIVE_SIZE:
+            del self.archive[0]
+        self._archive_matrix = np.stack(self.archive)
+
     def _evaluate_symmetry(self, canvas):
         """Calculate horizontal symmetry score (0-1)"""
         try:
             if canvas is None or canvas.ndim != 2:
                 return 0.0
                 
-            h, w = canvas.shape
-            half = w // 2
-            left = canvas[:, :half]
-            right = np.flip(canvas[:, half + w%2:], axis=1)
-            return 1 - np.mean(np.abs(left - right))
+            return self._make_evaluators(canvas.shape)[0](canvas)
         except Exception as e:
             print(f"Symmetry evaluation error: {e}")
             return 0.0
@@ -78,7 +229,7 @@ class FitnessEvaluator:
     def _evaluate_contrast(self, canvas):
         """Calculate contrast with minimum threshold"""
         try:
-            return max(np.std(canvas), 0.1)  # Ensure minimum contrast
+            return max(np.std(canvas) / 255, 0.1)  # Ensure minimum contrast
         except Exception as e:
             print(f"Contrast evaluation error: {e}")
             return 0.1
@@ -1,8 +1,45 @@
 import numpy as np
-from scipy.ndimage import sobel
-from sklearn.cluster import KMeans
+from scipy.ndimage import correlate1d
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+    @njit(fastmath=True, cache=True)
+    def _edge_density_kernel(canvas, threshold):
+        """
+        Fused Sobel magnitude + threshold count for a uint8 canvas.
+
+        Edges are clamped, matching scipy's default 'reflect' mode for a
+        3x3 kernel, and the magnitude is compared squared to skip the sqrt.
+        """
+        h, w = canvas.shape
+        limit = (threshold * 255.0) ** 2
+        count = 0
+        for y in range(h):
+            ym = max(y - 1, 0)
+            yp = min(y + 1, h - 1)
+            for x in range(w):
+                xm = max(x - 1, 0)
+                xp = min(x + 1, w - 1)
+                gx = (float(canvas[yp, xm]) - float(canvas[ym, xm])
+                      + 2.0 * (float(canvas[yp, x]) - float(canvas[ym, x]))
+                      + float(canvas[yp, xp]) - float(canvas[ym, xp]))
+                gy = (float(canvas[ym, xp]) - float(canvas[ym, xm])
+                      + 2.0 * (float(canvas[y, xp]) - float(canvas[y, xm]))
+                      + float(canvas[yp, xp]) - float(canvas[yp, xm]))
+                if gx * gx + gy * gy > limit:
+                    count += 1
+        return count / (h * w)
+else:
+    _edge_density_kernel = None
 
 class FitnessUtils:
+    """Canvas metrics; canvases are uint8 arrays in [0, 255]"""
+
     @staticmethod
     def calculate_symmetry(canvas):
         """Calculate horizontal symmetry score (0-1)"""
@@ -14,7 +51,7 @@ class FitnessUtils:
             half = w // 2
             left = canvas[:, :half]
             right = np.flip(canvas[:, half + w%2:], axis=1)
-            return 1 - np.mean(np.abs(left - right))
+            return 1 - np.mean(np.abs(left.astype(np.int16) - right)) / 255
         except Exception as e:
             print(f"Symmetry calculation error: {e}")
             return 0.0
@@ -23,31 +60,59 @@ class FitnessUtils:
     def calculate_contrast(canvas):
         """Calculate contrast with minimum safety threshold"""
         try:
-            return max(np.std(canvas), 0.1)  # Prevent complete flatness
+            return max(np.std(canvas) / 255, 0.1)  # Prevent complete flatness
         except Exception as e:
             print(f"Contrast calculation error: {e}")
             return 0.1
 
     @staticmethod
     def detect_edge_density(canvas, threshold=0.2):
-        """Calculate proportion of significant edges using Sobel operator"""
+        """
+        Calculate proportion of significant edges using Sobel operator.
+        Accepts a single (H, W) canvas or an (N, H, W) stack, per canvas.
+        """
         try:
-            dx = sobel(canvas, axis=0)
-            dy = sobel(canvas, axis=1)
+            if _edge_density_kernel is not None and canvas.ndim == 2:
+                return _edge_density_kernel(canvas, threshold)
+
+            canvas = canvas.astype(np.float32) / 255  # Sobel needs signed range
+            # Separable Sobel over the last two axes only, so stacked
+            # canvases are never smoothed into each other
+            dx = correlate1d(correlate1d(canvas, [-1, 0, 1], axis=-2), [1, 2, 1], axis=-1)
+            dy = correlate1d(correlate1d(canvas, [-1, 0, 1], axis=-1), [1, 2, 1], axis=-2)
             edge_strength = np.hypot(dx, dy)
-            return np.mean(edge_strength > threshold)
+            return np.mean(edge_strength > threshold, axis=(-2, -1))
         except Exception as e:
             print(f"Edge detection error: {e}")
             return 0.0
 
     @staticmethod 
     def calculate_color_coherence(canvas, n_clusters=3):
-        """Measure color organization using k-means clustering (0-1)"""
+        """
+        Measure color organization using k-means clustering (0-1).
+
+        Runs 1-D Lloyd iterations from a single quantile-seeded start on the
+        256-bin intensity histogram rather than on individual pixels, which
+        approximates pixel-level k-means for a fraction of the cost.
+        """
         try:
-            pixels = (canvas * 255).reshape(-1, 1).astype(np.uint8)
-            kmeans = KMeans(n_clusters=n_clusters, n_init=10).fit(pixels)
-            cluster_sizes = np.bincount(kmeans.labels_)
-            return 1 - (np.max(cluster_sizes) / len(pixels))  # 1 = balanced
+            hist = np.bincount(canvas.ravel(), minlength=256)
+            values = np.arange(len(hist))
+            total = hist.sum()
+
+            # Start centers at evenly spaced quantiles of the intensities
+            cdf = np.cumsum(hist)
+            centers = values[np.searchsorted(cdf, (np.arange(n_clusters) + 0.5) * total / n_clusters)]
+            centers = centers.astype(np.float64)
+            for _ in range(20):
+                labels = np.argmin(np.abs(values[:, None] - centers), axis=1)
+                cluster_sizes = np.bincount(labels, weights=hist, minlength=n_clusters)
+                sums = np.bincount(labels, weights=hist * values, minlength=n_clusters)
+                new_centers = np.where(cluster_sizes > 0, sums / np.maximum(cluster_sizes, 1), centers)
+                if np.array_equal(new_centers, centers):
+                    break
+                centers = new_centers
+            return 1 - (np.max(cluster_sizes) / total)  # 1 = balanced
         except Exception as e:
             print(f"Color clustering error: {e}")
             return 0.0
@@ -56,7 +121,7 @@ class FitnessUtils:
     def calculate_active_area(canvas, threshold=0.1):
         """Measure proportion of non-blank canvas area (0-1)"""
         try:
-            return np.mean(canvas > threshold)
+            return np.mean(canvas > threshold * 255)
         except Exception as e:
             print(f"Active area calculation error: {e}")
             return 0.0
\ No newline at end of file
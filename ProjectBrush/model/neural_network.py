@@ -1,5 +1,29 @@
+from functools import lru_cache
 import numpy as np
 import neat
+from scipy.sparse import csr_matrix
+from neat.activations import relu_activation, sigmoid_activation, tanh_activation
+from neat.aggregations import sum_aggregation
+
+# Array versions of NEAT's scalar activations, applied to a whole batch
+_BATCH_ACTIVATIONS = {
+    tanh_activation: lambda z: np.tanh(2.5 * z),  # Already saturated at NEAT's +/-60 clamp
+    sigmoid_activation: lambda z: 1.0 / (1.0 + np.exp(-np.clip(5.0 * z, -60.0, 60.0))),
+    relu_activation: lambda z: np.maximum(z, 0.0),
+}
+
+
+@lru_cache(maxsize=8)
+def _make_grid(size):
+    """
+    Builds the (2, size*size) x/y coordinate grid in [0, 1], shared
+    read-only by every network of that size.
+    """
+    x = np.linspace(0, 1, size, dtype=np.float32)
+    xx, yy = np.meshgrid(x, x)
+    grid = np.stack([xx.ravel(), yy.ravel()])
+    grid.flags.writeable = False
+    return grid
 
 class NeuralNetwork:
     """
@@ -7,6 +31,11 @@ class NeuralNetwork:
     (Now wraps NEAT genome instead of manual weight management)
     """
 
+    # Layer groups at least this large and at most this full use CSR weights;
+    # below that, dense matmul beats scipy's per-call overhead
+    SPARSE_MIN_SIZE = 4096
+    SPARSE_MAX_FILL = 0.5
+
     def __init__(self, genome, config):
         """
         Initializes neural network from NEAT genome.
@@ -22,27 +51,94 @@ class NeuralNetwork:
         # Track network structure for compatibility
         self.input_size = config.genome_config.num_inputs
         self.output_size = config.genome_config.num_outputs
+        self.size = int(np.sqrt(self.output_size))  # Edge length of the square output
         self.layers = self._get_network_structure()
+        self._compile_node_evals()
 
     def forward(self, input_data):
         """NEAT-compatible forward pass with spatial awareness"""
         try:
-            # Generate coordinate grid
-            size = int(np.sqrt(self.config.genome_config.num_outputs))
-            x = np.linspace(0, 1, size)
-            y = np.linspace(0, 1, size)
-            xx, yy = np.meshgrid(x, y)
-            
-            # Process spatial coordinates through network
-            output = []
-            for x_coord, y_coord in zip(xx.flatten(), yy.flatten()):
-                activation = self.network.activate([x_coord, y_coord])
-                output.append(activation[0])
-                
-            return np.array(output).reshape(size, size)
+            size = self.size
+            # Evaluate every coordinate at once, one row of values per node.
+            # A fresh copy per call keeps forward safe to run from several threads
+            values = self._initial_values.copy()
+            for rows, activation, aggregation, bias, response, in_rows, weights in self._node_evals:
+                inputs = values[in_rows]
+                if aggregation is sum_aggregation:
+                    total = weights @ inputs  # Whole layer group in one matmul
+                else:
+                    total = np.array([[aggregation(list(column)) for column in (w[:, None] * inputs).T] for w in weights])
+                values[rows] = activation(bias + response * total)
+
+            return values[self._output_row].reshape(size, size)
         except Exception as e:
             print(f"Forward error: {e}")
-            return np.zeros((10, 10))
+            return np.zeros((self.size, self.size), dtype=np.float32)
+
+    def _compile_node_evals(self):
+        """
+        Converts the network's node evaluations into row indices and weight
+        matrices so forward can evaluate all coordinates together.
+
+        Nodes at the same depth do not feed each other, so summing nodes
+        sharing an activation are grouped into one (nodes, inputs) weight
+        matrix and evaluated with a single matmul. Other aggregations would
+        see the group's zero-weighted inputs too, so those nodes are kept
+        as single-node evals over their own links.
+
+        Only the first output is drawn, so nodes it does not depend on are
+        dropped rather than evaluated for every pixel.
+        """
+        network = self.network
+        output_node = network.output_nodes[0]
+
+        # Walk back from the drawn output to find the nodes it depends on
+        evals_by_node = {node_eval[0]: node_eval for node_eval in network.node_evals}
+        needed = set()
+        pending = [output_node]
+        while pending:
+            node = pending.pop()
+            if node in needed or node not in evals_by_node:
+                continue
+            needed.add(node)
+            pending.extend(i for i, _ in evals_by_node[node][5])
+        node_evals = [node_eval for node_eval in network.node_evals if node_eval[0] in needed]
+
+        node_keys = list(network.input_nodes) + [output_node] + [node for node, *_ in node_evals]
+        node_keys += [i for *_, links in node_evals for i, _ in links]
+        self._node_rows = {key: row for row, key in enumerate(dict.fromkeys(node_keys))}
+        self._input_rows = [self._node_rows[key] for key in network.input_nodes]
+        self._output_row = self._node_rows[output_node]
+
+        # Value matrix with the coordinate grid already in the input rows
+        self._initial_values = np.zeros((len(self._node_rows), self.size * self.size), dtype=np.float32)
+        self._initial_values[self._input_rows] = _make_grid(self.size)
+
+        # node_evals is topologically ordered, so input depths are known first
+        depth = {}
+        groups = {}
+        for node_eval in node_evals:
+            node, act_func, agg_func, _, _, links = node_eval
+            depth[node] = 1 + max((depth.get(i, 0) for i, _ in links), default=0)
+            key = (depth[node], act_func, agg_func, None if agg_func is sum_aggregation else node)
+            groups.setdefault(key, []).append(node_eval)
+
+        self._node_evals = []
+        for (_, act_func, agg_func, _), group in sorted(groups.items(), key=lambda item: item[0][0]):
+            in_rows = sorted({self._node_rows[i] for *_, links in group for i, _ in links})
+            columns = {row: col for col, row in enumerate(in_rows)}
+            weights = np.zeros((len(group), len(in_rows)), dtype=np.float32)
+            for k, (*_, links) in enumerate(group):
+                for i, w in links:
+                    weights[k, columns[self._node_rows[i]]] = w
+            if (agg_func is sum_aggregation and weights.size >= self.SPARSE_MIN_SIZE
+                    and np.count_nonzero(weights) <= self.SPARSE_MAX_FILL * weights.size):
+                weights = csr_matrix(weights)
+            rows = [self._node_rows[node] for node, *_ in group]
+            bias = np.array([[node_eval[3]] for node_eval in group], dtype=np.float32)
+            response = np.array([[node_eval[4]] for node_eval in group], dtype=np.float32)
+            activation = _BATCH_ACTIVATIONS.get(act_func, np.vectorize(act_func, otypes=[np.float32]))
+            self._node_evals.append((rows, activation, agg_func, bias, response, in_rows, weights))
 
     def _get_network_structure(self):
         """
@@ -52,15 +148,14 @@ class NeuralNetwork:
             list: Layer sizes [input, hidden..., output]
         """
         layers = [self.input_size]
-        node_ids = sorted(self.genome.nodes.keys())
-        
+
         # Count hidden nodes (exclude input/output)
-        input_range = range(0, -self.input_size, -1)
-        output_range = range(1, self.output_size+1)
-        hidden_nodes = [n for n in node_ids if n not in input_range and n not in output_range]
-        
-        if hidden_nodes:
-            layers.append(len(hidden_nodes))
+        genome_config = self.config.genome_config
+        io_nodes = frozenset(genome_config.input_keys) | frozenset(genome_config.output_keys)
+        hidden_count = sum(1 for n in self.genome.nodes if n not in io_nodes)
+
+        if hidden_count:
+            layers.append(hidden_count)
         layers.append(self.output_size)
         
         return layers
@@ -1,5 +1,37 @@
 import numpy as np
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+    @njit(fastmath=True, cache=True)
+    def _quantize_kernel(canvas, out):
+        """
+        Min/max in one pass, then a second pass writing the rescaled uint8
+        values straight into out; no temporaries.
+        """
+        flat = canvas.ravel()
+        quantized = out.ravel()
+        minimum = flat[0]
+        maximum = flat[0]
+        for value in flat:
+            if value < minimum:
+                minimum = value
+            elif value > maximum:
+                maximum = value
+        if maximum == minimum:
+            quantized[:] = 0
+            return
+        scale = 255.0 / (maximum - minimum)
+        for i in range(flat.size):
+            quantized[i] = np.uint8(round((flat[i] - minimum) * scale))
+else:
+    _quantize_kernel = None
+
+
 class Pattern:
     def __init__(self, neural_network, metadata=None):
         """
@@ -12,37 +44,75 @@ class Pattern:
         self.neural_network = neural_network  # Correct attribute name
         self.metadata = metadata if metadata else {}
         self.fitness = 0
-        self.canvas = None
-        self.generate_pattern()
+        self._canvas = None
+        self._dirty = True  # Fitness is stale until the current canvas is scored
+
+    @property
+    def canvas(self):
+        """
+        Rendered pattern, generated on first access and cached afterwards.
+        """
+        if self._canvas is None:
+            self.generate_pattern()
+        return self._canvas
 
-    def generate_pattern(self):
+    @canvas.setter
+    def canvas(self, value):
+        self._canvas = value
+        self._dirty = True
+
+    def generate_pattern(self, out=None):
+        """
+        Renders the pattern canvas from the neural network.
+
+        Args:
+            out (numpy.ndarray, optional): Preallocated buffer to render into,
+                used when its shape matches the rendered canvas
+        """
         try:
-            # Get output from network
-            output = self.neural_network.forward(None)  # Input handled internally
-            
-            # Ensure output is a valid array
-            if not isinstance(output, np.ndarray):
-                output = np.random.rand(10, 10)
-                
-            # Ensure valid output dimensions
-            if output.size < 100:
-                output = np.pad(output, (0, 100 - output.size))
-                
-            side_length = int(np.sqrt(output.size))
-            self.canvas = output[:side_length**2].reshape(side_length, side_length)
+            # Forward already returns the network's square (side, side) output
+            canvas = self.neural_network.forward(None)  # Input handled internally
+            if out is None or out.shape != canvas.shape:
+                out = np.empty(canvas.shape, dtype=np.uint8)
             
-            # Normalize to [0,1]
-            self.canvas = (self.canvas - np.min(self.canvas)) / \
-                         (np.max(self.canvas) - np.min(self.canvas) + 1e-7)
+            # Normalize and quantize to uint8 [0,255]
+            # The kernel writes through out.ravel(), which copies a
+            # non-contiguous out; the numpy path handles any layout
+            if _quantize_kernel is not None and canvas.flags.c_contiguous and out.flags.c_contiguous:
+                _quantize_kernel(canvas, out)
+            else:
+                minimum = canvas.min()
+                maximum = canvas.max()
+                if maximum == minimum:
+                    # Constant output quantizes to all zeros; skip the rescale
+                    out.fill(0)
+                else:
+                    shifted = np.subtract(canvas, minimum, dtype=np.float32)
+                    shifted *= 255.0 / (maximum - minimum)
+                    np.rint(shifted, out=out, casting="unsafe")
+            self.canvas = out
         except Exception as e:
             print(f"Pattern generation error: {e}")
-            self.canvas = np.random.rand(10, 10)
+            self.canvas = np.random.randint(0, 256, (10, 10), dtype=np.uint8)
+
+    @property
+    def needs_evaluation(self):
+        """Whether the canvas changed since fitness was last computed"""
+        return self._dirty
+
+    @needs_evaluation.setter
+    def needs_evaluation(self, value):
+        self._dirty = value
 
     def evaluate_fitness(self, fitness_evaluator):
         """
-        Evaluates pattern fitness using provided evaluator.
+        Evaluates pattern fitness using provided evaluator, reusing the
+        cached fitness when the canvas has not changed since last scored.
         """
+        if not self._dirty:
+            return
         self.fitness = fitness_evaluator.evaluate_objective(self)
+        self._dirty = False
 
     def __repr__(self):
         """
@@ -50,5 +120,5 @@ class Pattern:
         """
         network_info = self.neural_network.__repr__()
         return (f"Pattern(Fitness: {self.fitness:.2f}, "
-                f"Canvas: {self.canvas.shape if self.canvas is not None else 'None'}, "
+                f"Canvas: {self._canvas.shape if self._canvas is not None else 'None'}, "
                 f"Network: {network_info})")
\ No newline at end of file
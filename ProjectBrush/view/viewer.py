@@ -1,14 +1,28 @@
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import ttk
 from PIL import Image, ImageTk
 import numpy as np
 import matplotlib.cm as cm
 
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
 class Viewer:
     """
     Handles visualization and user interaction for the AI Art Evolution project.
     """
 
+    # Viridis colors for each uint8 canvas value, shape (256, 3)
+    VIRIDIS_LUT = cm.viridis(np.arange(256), bytes=True)[:, :3]
+    VIRIDIS_PALETTE = VIRIDIS_LUT.tobytes()
+
+    # Thumbnail edge lengths snap down to multiples of this, an integer
+    # multiple of the default 10x10 canvas so NEAREST blocks stay even
+    THUMBNAIL_STEP = 20
+
     def __init__(self, controller, root):
         self.controller = controller
         self.root = root
@@ -22,6 +36,22 @@ class Viewer:
         self.feedback_frame = ttk.Frame(self.root)
         self.resize_debounce_timer = None
         self.last_window_size = (0, 0)
+        self._canvas_width = 1  # canvas_frame width, kept current by <Configure>
+
+        # Thumbnail widgets reused across renders
+        self._labels = []
+        self._photos = []
+        self._shown = []  # Network whose output each slot's PhotoImage shows
+        self._placeholder_photo = None  # Gray thumbnail for patterns without a canvas
+        self._grid_size = 0
+        self._thumbnail_size = 0
+        self._render_pending = False
+        self._rendered_generation = None  # Generation the last update_ui render was for
+        self._label_texts = {}  # Text last set on each statistics label
+
+        # Thumbnails are colormapped and resized off the Tk thread
+        self._render_pool = ThreadPoolExecutor(max_workers=4)
+        self._render_token = 0  # Bumped per render so stale results are dropped
 
         self._setup_ui()
 
@@ -45,6 +75,7 @@ class Viewer:
 
         # Event bindings
         self.root.bind("<Configure>", self._resize_canvas)
+        self.canvas_frame.bind("<Configure>", self._track_canvas_width)
 
         # Initialize components
         self.controls_frame.pack(side=tk.LEFT, fill=tk.Y)
@@ -70,49 +101,124 @@ class Viewer:
         self.best_fitness_label.pack(pady=10)
 
     def render_patterns(self, population):
-        """Renders population patterns"""
-        try:
-            for widget in self.canvas_grid_frame.winfo_children():
-                widget.destroy()
-        except RuntimeError:
-            pass
-
-        grid_size = int(np.ceil(np.sqrt(len(population))))
-        thumbnail_size = max(100, self.canvas_frame.winfo_width() // (grid_size + 3))
-
-        for i, pattern in enumerate(population):
-            if pattern.canvas is not None:
-                try:
-                    normalized = (pattern.canvas - np.min(pattern.canvas)) / (np.max(pattern.canvas) - np.min(pattern.canvas) + 1e-7)
-                    colored = (cm.viridis(normalized)[:, :, :3] * 255).astype(np.uint8)
-                    img = Image.fromarray(colored).resize((thumbnail_size, thumbnail_size))
-                    photo = ImageTk.PhotoImage(img)
-                    label = tk.Label(self.canvas_grid_frame, image=photo)
-                    label.image = photo
-                    label.grid(row=i//grid_size, column=i%grid_size, padx=5, pady=5)
-                    
-                    # Upscale with anti-aliasing
-                    img = Image.fromarray(colored).resize(
-                        (thumbnail_size, thumbnail_size), 
-                        resample=Image.Resampling.LANCZOS  # High-quality resampling
-                    )
-                    
-                    # Sharpening filter for detail
-                    from PIL import ImageFilter
-                    img = img.filter(ImageFilter.SHARPEN)
-                    
-                    photo = ImageTk.PhotoImage(img)
-                except Exception as e:
-                    print(f"Rendering error: {e}")
+        """
+        Renders population patterns. Colormapping and resizing run on worker
+        threads; the finished thumbnails are installed from the Tk thread.
+        """
+        grid_size, thumbnail_size = self._layout(len(population))
+        self._sync_label_pool(len(population), grid_size, thumbnail_size)
+
+        # Patterns are rebuilt every generation, but elites keep their
+        # network; slots already showing that network's output are left as is
+        self._render_token += 1
+        futures = [
+            None if shown is pattern.neural_network
+            else self._render_pool.submit(self._make_thumbnail, pattern, thumbnail_size)
+            for pattern, shown in zip(population, self._shown)
+        ]
+        self._install_thumbnails(population, futures, self._render_token)
+
+    def _layout(self, count):
+        """
+        Returns:
+            tuple: (grid_size, thumbnail_size) for count patterns at the
+                current canvas width
+        """
+        grid_size = int(np.ceil(np.sqrt(count)))
+        thumbnail_size = self._canvas_width // (grid_size + 3)
+        thumbnail_size = max(100, thumbnail_size - thumbnail_size % self.THUMBNAIL_STEP)
+        return grid_size, thumbnail_size
+
+    def _make_thumbnail(self, pattern, thumbnail_size):
+        """
+        Builds one resized thumbnail image, or None when the pattern has no
+        canvas (worker thread; no Tk calls).
+        """
+        canvas = pattern.canvas
+        if canvas is None:
+            return None
+        # Stays one byte per pixel through the resize; the PhotoImage paste
+        # expands the viridis palette to RGB in C
+        canvas = np.ascontiguousarray(canvas)
+        size = (thumbnail_size, thumbnail_size)
+        if cv2 is not None:
+            indices = cv2.resize(canvas, size, interpolation=cv2.INTER_NEAREST)
+            img = Image.frombuffer("P", size, indices, "raw", "P", 0, 1)
+        else:
+            img = Image.frombuffer("P", canvas.shape[::-1], canvas, "raw", "P", 0, 1)
+            img = img.resize(size, Image.Resampling.NEAREST)
+        img.putpalette(self.VIRIDIS_PALETTE)
+        return img
+
+    def _install_thumbnails(self, population, futures, token):
+        """
+        Pastes finished thumbnails into the label pool (Tk thread only),
+        polling until all are ready. Results of a superseded render are
+        dropped.
+        """
+        if token != self._render_token:
+            return
+        if not all(future.done() for future in futures if future is not None):
+            self.root.after(10, self._install_thumbnails, population, futures, token)
+            return
+
+        for i, future in enumerate(futures):
+            if future is None:
+                continue
+            label = self._labels[i]
+            try:
+                img = future.result()
+            except Exception as e:
+                print(f"Rendering error: {e}")
+                continue
+            if img is not None:
+                photo = self._photos[i]
+                photo.paste(img)  # Updates the label in place if it already shows photo
             else:
-                placeholder = tk.Label(self.canvas_grid_frame, text="No Image", bg="gray", width=15, height=10)
-                placeholder.grid(row=i//grid_size, column=i%grid_size, padx=5, pady=5)
+                photo = self._placeholder_photo
+            if label.image is not photo:
+                label.configure(image=photo)
+                label.image = photo
+            self._shown[i] = population[i].neural_network
+
+    def _sync_label_pool(self, count, grid_size, thumbnail_size):
+        """
+        Grows or shrinks the reusable thumbnail labels to count, regridding
+        them only when the layout changes, and reallocates the PhotoImages
+        when the thumbnail size changes.
+        """
+        if thumbnail_size != self._thumbnail_size:
+            self._photos = []
+            self._shown = []
+            self._thumbnail_size = thumbnail_size
+            self._placeholder_photo = ImageTk.PhotoImage(
+                Image.new("RGB", (thumbnail_size, thumbnail_size), (128, 128, 128))
+            )
+        while len(self._photos) < count:
+            self._photos.append(ImageTk.PhotoImage("RGB", (thumbnail_size, thumbnail_size)))
+            self._shown.append(None)
+        del self._photos[count:]
+        del self._shown[count:]
 
-        self.canvas_grid_frame.update_idletasks()
+        regrid = grid_size != self._grid_size or len(self._labels) < count
+        while len(self._labels) > count:
+            self._labels.pop().destroy()
+        while len(self._labels) < count:
+            label = tk.Label(self.canvas_grid_frame)
+            label.image = None
+            self._labels.append(label)
+        if regrid:
+            for i, label in enumerate(self._labels):
+                label.grid(row=i//grid_size, column=i%grid_size, padx=5, pady=5)
+            self._grid_size = grid_size
 
     def _resize_canvas(self, event):
         """Handles window resizing"""
-        current_size = (self.root.winfo_width(), self.root.winfo_height())
+        # <Configure> on root also fires for every child widget; only the
+        # window itself matters here
+        if event.widget is not self.root:
+            return
+        current_size = (event.width, event.height)
         if current_size == self.last_window_size:
             return
             
@@ -121,21 +227,48 @@ class Viewer:
             self.root.after_cancel(self.resize_debounce_timer)
         self.resize_debounce_timer = self.root.after(200, self._safe_render)
 
+    def _track_canvas_width(self, event):
+        """Caches canvas_frame's width so renders need no winfo round trip"""
+        self._canvas_width = event.width
+
     def _safe_render(self):
-        """Safe pattern re-rendering"""
-        self.root.unbind("<Configure>")
-        try:
-            self.render_patterns(self.controller.get_population())
-        finally:
-            self.root.bind("<Configure>", self._resize_canvas)
+        """Re-renders after a resize, unless the thumbnail layout is unchanged"""
+        self.resize_debounce_timer = None
+        population = self.controller.get_population()
+        if self._layout(len(population)) != (self._grid_size, self._thumbnail_size):
+            self.render_patterns(population)
 
     def update_ui(self, stats):
         """Updates all UI elements"""
-        self.generation_label.config(text=f"Generation: {stats['generation']}")
-        self.average_fitness_label.config(text=f"Avg Fitness: {max(stats['average_fitness'], 0):.2f}")
-        self.best_fitness_label.config(text=f"Best Fitness: {max(stats['best_fitness'], 0):.2f}")
+        self._set_label_text(self.generation_label, f"Generation: {stats['generation']}")
+        self._set_label_text(self.average_fitness_label, f"Avg Fitness: {max(stats['average_fitness'], 0):.2f}")
+        self._set_label_text(self.best_fitness_label, f"Best Fitness: {max(stats['best_fitness'], 0):.2f}")
+
+        # The population only changes when a new generation has run
+        if stats["generation"] != self._rendered_generation:
+            self._rendered_generation = stats["generation"]
+            self.schedule_render()
+
+    def _set_label_text(self, label, text):
+        """Configures a label's text only when it differs from what it shows"""
+        if self._label_texts.get(label) != text:
+            label.config(text=text)
+            self._label_texts[label] = text
+
+    def schedule_render(self):
+        """
+        Renders the current population in Tk's next idle slot. Requests made
+        before then collapse into that one render, which draws the newest
+        population.
+        """
+        if not self._render_pending:
+            self._render_pending = True
+            self.root.after_idle(self._render_scheduled)
+
+    def _render_scheduled(self):
+        """Runs the pending render (Tk thread only)"""
+        self._render_pending = False
         self.render_patterns(self.controller.get_population())
-        self.root.update_idletasks()
     
     def _apply_postprocessing(self, image):
         """Enhances image details"""
@@ -157,15 +290,16 @@ class Viewer:
     # Controller interaction methods
     def _start_simulation(self):
         self.controller.start_simulation()
-        self.render_patterns(self.controller.get_population())
+        self.schedule_render()
 
     def _stop_simulation(self):
         self.controller.stop_simulation()
 
     def _reset_simulation(self):
         self.controller.reset_simulation()
-        self.render_patterns(self.controller.get_population())
         self.update_ui({"generation": 0, "average_fitness": 0, "best_fitness": 0})
+        # Rendered once Tk is idle, so the button press is drawn first
+        self.schedule_render()
 
     def _export_images(self):
         self.controller.export_evolution_data(format="images")